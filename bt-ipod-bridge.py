@@ -12,38 +12,230 @@ Assumes the /opt/ipod/ipod client:
 
 import os
 import sys
+import glob
+import errno
+import platform
 import time
+import codecs
+import ctypes
+import select
+import selectors
+import struct
 import subprocess
 import dbus
+import dbus.mainloop.glib
+import dbus.service
+import atexit
 import logging
+import logging.handlers
 import signal
 import threading
 from threading import Thread, Lock
 import queue # Using queue for thread-safe communication
+from gi.repository import GLib
+import pulsectl
 
 # Configure logging
 # Ensure the log directory exists and has correct permissions if running as non-root
 # sudo mkdir -p /var/log
 # sudo chown your_user:your_group /var/log/bt-ipod-bridge.log # Adjust user/group if not root
-logging.basicConfig(level=logging.INFO,
-                    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
-                    filename='/var/log/bt-ipod-bridge.log',
-                    filemode='a') # Append mode
-logger = logging.getLogger('bt-ipod-bridge')
-# Also log to console for easier debugging when running manually
-console_handler = logging.StreamHandler(sys.stdout)
-console_handler.setLevel(logging.INFO)
+class DroppingQueueHandler(logging.handlers.QueueHandler):
+    """QueueHandler that discards records instead of erroring when the queue is full."""
+
+    def enqueue(self, record):
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            pass
+
 formatter = logging.Formatter('%(asctime)s - %(name)s - %(levelname)s - %(message)s')
-console_handler.setFormatter(formatter)
-logger.addHandler(console_handler)
+file_handler = logging.FileHandler('/var/log/bt-ipod-bridge.log', mode='a') # Append mode
+file_handler.setFormatter(formatter)
+log_handlers = [file_handler]
+# Also log to console for easier debugging when running manually (or when asked to under systemd)
+if sys.stdout.isatty() or os.environ.get('BT_IPOD_BRIDGE_CONSOLE_LOG'):
+    console_handler = logging.StreamHandler(sys.stdout)
+    console_handler.setLevel(logging.INFO)
+    console_handler.setFormatter(formatter)
+    log_handlers.append(console_handler)
+# Callers only enqueue; the file/console writes happen on the listener's own thread
+log_queue = queue.Queue(maxsize=4096)
+logging.root.addHandler(DroppingQueueHandler(log_queue)) # No formatter here; the listener's handlers format
+logging.root.setLevel(logging.INFO)
+log_listener = logging.handlers.QueueListener(log_queue, *log_handlers, respect_handler_level=True)
+log_listener.start()
+atexit.register(log_listener.stop) # Flush what is queued on exit
+logger = logging.getLogger('bt-ipod-bridge')
 
 # --- Constants ---
 IPOD_CLIENT_PATH = '/opt/ipod/ipod'
 IPOD_DEVICE_PATH = '/dev/iap0'
 IPOD_TRACE_PATH = '/tmp/ipod.trace'
+IPOD_DEVICE_TIMEOUT = 10 # seconds to wait for the device node after loading modules
+METADATA_WRITE_TIMEOUT = 0.05 # seconds to wait for room in the client's stdin pipe before dropping an update
 PULSEAUDIO_SINK = 'alsa_output.platform-g_ipod_audio.0.analog-stereo' # Verify this name
 PULSEAUDIO_LATENCY_MSEC = 50
+PULSEAUDIO_SOURCE_TIMEOUT = 10 # seconds to wait for a new device's source to be registered
 BLUETOOTH_ALIAS = 'Volvo-iPod-Bridge'
+BLUETOOTH_ADAPTER_PATH = '/org/bluez/hci0'
+BLUETOOTH_AGENT_PATH = '/org/bluez/bt_ipod_bridge/agent'
+BLUETOOTH_AGENT_CAPABILITY = 'NoInputNoOutput' # Headless: accept pairing without prompts
+KERNEL_MODULES = ['libcomposite', 'g_ipod_audio', 'g_ipod_hid', 'g_ipod_gadget']
+MODPROBE_CONFIG_DIRS = ['/etc/modprobe.d', '/run/modprobe.d', '/lib/modprobe.d']
+# glibc has no finit_module() wrapper, so it goes through syscall(2). Keyed by (CPU family,
+# interpreter pointer bits): a 32-bit userland on a 64-bit kernel (e.g. armhf Raspberry Pi OS
+# on an aarch64 kernel) uses the 32-bit syscall table, whatever platform.machine() says.
+FINIT_MODULE_SYSCALLS = {('arm', 64): 273, ('arm', 32): 379, ('x86', 64): 313, ('x86', 32): 350}
+# Common A2DP UUIDs (Audio Sink, Advanced Audio Distribution)
+A2DP_UUIDS = frozenset(('0000110b-0000-1000-8000-00805f9b34fb',
+                        '0000110d-0000-1000-8000-00805f9b34fb'))
+# Profiles the pairing agent lets devices connect to: A2DP (Audio Source/Sink, Advanced Audio
+# Distribution) and AVRCP (Remote Control Target, Remote Control, Remote Control Controller)
+AGENT_AUTHORIZED_UUIDS = frozenset(('0000110a-0000-1000-8000-00805f9b34fb',
+                                    '0000110b-0000-1000-8000-00805f9b34fb',
+                                    '0000110d-0000-1000-8000-00805f9b34fb',
+                                    '0000110c-0000-1000-8000-00805f9b34fb',
+                                    '0000110e-0000-1000-8000-00805f9b34fb',
+                                    '0000110f-0000-1000-8000-00805f9b34fb'))
+# Pre-encoded metadata line prefixes for the iPod client's stdin protocol
+PREFIX_TITLE = b'TITLE='
+PREFIX_ARTIST = b'ARTIST='
+PREFIX_ALBUM = b'ALBUM='
+PREFIX_DURATION = b'DURATION='
+NEWLINE = b'\n'
+# iPod client control commands -> BluetoothAudioReceiver method names
+# (Commands are ASSUMED - VERIFY from Go client source)
+IPOD_COMMANDS = {
+    'PLAY': 'play',
+    'PAUSE': 'pause',
+    'NEXT': 'next_track',
+    'PREVIOUS': 'previous_track',
+    'PREV': 'previous_track',
+    'STOP': 'stop_playback',
+    # Add more commands if needed (e.g., volume up/down if supported)
+}
+
+
+def dbus_to_native(value):
+    """Recursively convert dbus-python wrapper types (dbus.String, dbus.UInt32, ...) to plain Python."""
+    if isinstance(value, dbus.Boolean): # Subclass of int, so check first
+        return bool(value)
+    if isinstance(value, str): # dbus.String, dbus.ObjectPath, dbus.Signature
+        return str(value)
+    if isinstance(value, int):
+        return int(value)
+    if isinstance(value, float):
+        return float(value)
+    if isinstance(value, dict):
+        return {str(k): dbus_to_native(v) for k, v in value.items()}
+    if isinstance(value, (list, tuple)): # dbus.Array, dbus.Struct
+        return [dbus_to_native(v) for v in value]
+    return value
+
+
+class InotifyWatch:
+    """Minimal ctypes wrapper around Linux inotify, used to wait for a directory entry to be created."""
+
+    IN_MOVED_TO = 0x00000080
+    IN_CREATE = 0x00000100
+    EVENT_HEADER = struct.Struct('iIII') # wd, mask, cookie, len; followed by the name
+
+    def __init__(self, directory, mask=IN_CREATE | IN_MOVED_TO):
+        libc = ctypes.CDLL(None, use_errno=True)
+        self.fd = libc.inotify_init1(os.O_NONBLOCK | os.O_CLOEXEC)
+        if self.fd < 0:
+            err = ctypes.get_errno()
+            raise OSError(err, os.strerror(err))
+        if libc.inotify_add_watch(self.fd, os.fsencode(directory), mask) < 0:
+            err = ctypes.get_errno()
+            os.close(self.fd)
+            raise OSError(err, os.strerror(err), directory)
+
+    def wait_for(self, name, timeout):
+        """Return True once an entry called name is created, False after timeout seconds."""
+        deadline = time.monotonic() + timeout
+        while True:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                return False
+            readable, _, _ = select.select([self.fd], [], [], remaining)
+            if not readable:
+                return False
+            buf = os.read(self.fd, 4096)
+            offset = 0
+            while offset < len(buf):
+                _, _, _, length = self.EVENT_HEADER.unpack_from(buf, offset)
+                offset += self.EVENT_HEADER.size
+                entry = buf[offset:offset + length].rstrip(b'\0')
+                offset += length
+                if os.fsdecode(entry) == name:
+                    return True
+
+    def close(self):
+        os.close(self.fd)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+class AgentRejected(dbus.DBusException):
+    """Returned to BlueZ to refuse an agent request."""
+    _dbus_error_name = 'org.bluez.Error.Rejected'
+
+
+class PairingAgent(dbus.service.Object):
+    """Minimal BlueZ Agent1 for a headless bridge.
+
+    Pairing is accepted without user interaction (there is no display or keypad), but
+    services are only authorized for the audio profiles in AGENT_AUTHORIZED_UUIDS.
+    """
+
+    AGENT_INTERFACE = 'org.bluez.Agent1'
+
+    @dbus.service.method(AGENT_INTERFACE, in_signature='', out_signature='')
+    def Release(self):
+        logger.info("Bluetooth agent released")
+
+    @dbus.service.method(AGENT_INTERFACE, in_signature='o', out_signature='s')
+    def RequestPinCode(self, device):
+        logger.info(f"PIN code requested by {device}, replying 0000")
+        return '0000'
+
+    @dbus.service.method(AGENT_INTERFACE, in_signature='o', out_signature='u')
+    def RequestPasskey(self, device):
+        logger.info(f"Passkey requested by {device}, replying 0")
+        return dbus.UInt32(0)
+
+    @dbus.service.method(AGENT_INTERFACE, in_signature='ouq', out_signature='')
+    def DisplayPasskey(self, device, passkey, entered):
+        logger.info(f"Passkey for {device}: {passkey:06d}")
+
+    @dbus.service.method(AGENT_INTERFACE, in_signature='os', out_signature='')
+    def DisplayPinCode(self, device, pincode):
+        logger.info(f"PIN code for {device}: {pincode}")
+
+    @dbus.service.method(AGENT_INTERFACE, in_signature='ou', out_signature='')
+    def RequestConfirmation(self, device, passkey):
+        logger.info(f"Auto-confirming pairing with {device} (passkey {passkey:06d})")
+
+    @dbus.service.method(AGENT_INTERFACE, in_signature='o', out_signature='')
+    def RequestAuthorization(self, device):
+        logger.info(f"Auto-authorizing pairing with {device}")
+
+    @dbus.service.method(AGENT_INTERFACE, in_signature='os', out_signature='')
+    def AuthorizeService(self, device, uuid):
+        if str(uuid).lower() not in AGENT_AUTHORIZED_UUIDS:
+            logger.warning("Rejecting service %s for %s", uuid, device)
+            raise AgentRejected(f"Service {uuid} is not allowed")
+        logger.info("Authorizing audio service %s for %s", uuid, device)
+
+    @dbus.service.method(AGENT_INTERFACE, in_signature='', out_signature='')
+    def Cancel(self):
+        logger.info("Pairing request cancelled")
+
 
 class BluetoothAudioReceiver:
     """Handles Bluetooth connections, audio streaming and AVRCP."""
@@ -54,6 +246,9 @@ class BluetoothAudioReceiver:
         self.connected_device_path = None
         self.media_player_path = None
         self.media_player_iface = None
+        self.media_player_props_iface = None
+        self.media_player_signal = None # PropertiesChanged subscription for the player
+        self.playback_status = 'unknown'
         self.last_track_info = {}
         self.current_track = {
             'title': '',
@@ -63,62 +258,292 @@ class BluetoothAudioReceiver:
             'position': 0 # Milliseconds (Note: BlueZ often doesn't provide this reliably)
         }
         self.lock = Lock() # Protect access to shared state if needed
+        self._objects = {} # BlueZ object tree, seeded once and kept current by D-Bus signals
+        self._players = {} # Device path -> MediaPlayer1 path, maintained alongside _objects
+        self._player_search_lock = Lock()
+        self._player_search_done = threading.Condition(self._player_search_lock)
+        self._player_searching = False # Single-flight flag for find_media_player
+        self.connection_changed = threading.Event() # Set when a device connects/disconnects
+        self.track_changed = threading.Event() # Set when the player reports new track metadata
+        self.wakeup = threading.Event() # Set alongside either flag to wake the sync loop
+        self.connection_failed = False # Last connection check failed and should be retried
+        self.main_loop = None
+        self.main_loop_thread = None
+        self.agent = None
+        self.pulse = None
+        self._source_names = {} # Device MAC -> candidate PulseAudio source names
+        self._bluez_owner = None # Unique bus name of the running bluetoothd, once known
         logger.info("Initializing Bluetooth receiver")
         try:
+            # Signal delivery needs a main loop; must be set before the bus is created
+            dbus.mainloop.glib.DBusGMainLoop(set_as_default=True)
             self.bus = dbus.SystemBus()
         except Exception as e:
             logger.exception(f"Failed to connect to D-Bus System Bus: {e}")
             # Consider exiting or handling this more gracefully if D-Bus is essential
+        # One libpulse connection for the life of the bridge instead of spawning pactl
+        self._get_pulse()
 
     def start(self):
         """Start the Bluetooth service and make device discoverable."""
         logger.info("Starting Bluetooth service and discovery...")
+        if not self.bus:
+            logger.error("D-Bus connection not available, cannot start Bluetooth receiver.")
+            return False
         try:
             # Ensure Bluetooth service is running
-            # Use check=True to raise CalledProcessError on failure
-            subprocess.run(['systemctl', 'start', 'bluetooth'], check=True)
-            # Make device discoverable
-            subprocess.run(['bluetoothctl', 'discoverable', 'on'], check=True)
-            # Set friendly name
-            subprocess.run(['bluetoothctl', 'system-alias', BLUETOOTH_ALIAS], check=True)
+            if not self._start_bluetooth_service():
+                return False
+
+            # Cache BlueZ state once, then let signals keep it current
+            self._init_object_cache()
+            # A freshly started bluetoothd owns its name before hci0 is registered; in that
+            # case _on_interfaces_added configures the adapter once it is announced
+            if 'org.bluez.Adapter1' in self._objects.get(BLUETOOTH_ADAPTER_PATH, {}):
+                self._configure_adapter()
+            else:
+                logger.info("Adapter %s not registered yet; configuring it when it appears", BLUETOOTH_ADAPTER_PATH)
+            self._start_main_loop()
             logger.info("Bluetooth receiver started successfully")
 
-            # Start agent to handle pairing requests (in background)
+            # Register agent to handle pairing requests (served by the main loop)
             self._start_agent()
             return True
-        except subprocess.CalledProcessError as e:
-            logger.error(f"Failed to run bluetooth command: {e}")
+        except dbus.exceptions.DBusException as e:
+            logger.error(f"D-Bus error configuring Bluetooth adapter: {e}")
             return False
         except Exception as e:
             logger.exception(f"Failed to start Bluetooth receiver: {e}")
             return False
 
+    def _configure_adapter(self):
+        """Make the adapter discoverable under the bridge's alias."""
+        # No introspection, so Set() needs an explicit 'ssv' signature to send a variant
+        adapter_props = dbus.Interface(self.bus.get_object('org.bluez', BLUETOOTH_ADAPTER_PATH, introspect=False),
+                                       'org.freedesktop.DBus.Properties')
+        current = adapter_props.GetAll('org.bluez.Adapter1')
+        # Make device discoverable (only write what differs; each Set is a round-trip and a mgmt command)
+        if not current.get('Discoverable'):
+            adapter_props.Set('org.bluez.Adapter1', 'Discoverable', dbus.Boolean(True), signature='ssv')
+        # Set friendly name
+        if current.get('Alias') != BLUETOOTH_ALIAS:
+            adapter_props.Set('org.bluez.Adapter1', 'Alias', dbus.String(BLUETOOTH_ALIAS), signature='ssv')
+
+    def stop(self):
+        """Stop dispatching D-Bus signals."""
+        if self.main_loop and self.main_loop.is_running():
+            logger.info("Stopping D-Bus signal loop")
+            self.main_loop.quit()
+
+    def _start_bluetooth_service(self, timeout=10):
+        """Start bluetooth.service via systemd and wait for BlueZ to claim its bus name."""
+        if self.bus.name_has_owner('org.bluez'):
+            return True # Already up; BlueZ owning its name is exactly what we would wait for
+        logger.info("BlueZ is not on the bus, starting bluetooth.service")
+        systemd = dbus.Interface(self.bus.get_object('org.freedesktop.systemd1', '/org/freedesktop/systemd1', introspect=False),
+                                 'org.freedesktop.systemd1.Manager')
+        systemd.StartUnit('bluetooth.service', 'replace')
+        deadline = time.monotonic() + timeout
+        while not self.bus.name_has_owner('org.bluez'):
+            if time.monotonic() > deadline:
+                logger.error(f"BlueZ did not appear on D-Bus within {timeout} seconds.")
+                return False
+            time.sleep(0.2)
+        return True
+
+    def _init_object_cache(self):
+        """Subscribe to BlueZ object signals and seed the cache with one GetManagedObjects()."""
+        manager = dbus.Interface(self.bus.get_object('org.bluez', '/', introspect=False),
+                                 'org.freedesktop.DBus.ObjectManager')
+        manager.connect_to_signal('InterfacesAdded', self._on_interfaces_added)
+        manager.connect_to_signal('InterfacesRemoved', self._on_interfaces_removed)
+        self.bus.add_signal_receiver(self._on_properties_changed,
+                                     dbus_interface='org.freedesktop.DBus.Properties',
+                                     signal_name='PropertiesChanged',
+                                     bus_name='org.bluez',
+                                     arg0='org.bluez.Device1',
+                                     path_keyword='path')
+        # bluetoothd forgets the agent and adapter settings when it restarts; redo them if it does
+        self.bus.watch_name_owner('org.bluez', self._on_bluez_owner_changed)
+        # Signals are only dispatched once the main loop runs, so none are lost here
+        self._seed_object_cache(manager)
+
+    def _seed_object_cache(self, manager):
+        """Replace the cache with a fresh GetManagedObjects() snapshot."""
+        # Converted once on arrival so later scans work on plain Python objects
+        objects = dbus_to_native(manager.GetManagedObjects())
+        with self.lock:
+            self._objects = objects
+            self._players = {path.rsplit('/', 1)[0]: path for path, interfaces in objects.items()
+                             if 'org.bluez.MediaPlayer1' in interfaces}
+        logger.info(f"Cached {len(self._objects)} BlueZ objects")
+        self.connection_changed.set() # Evaluate the seeded state once
+        self.wakeup.set()
+
+    def _on_bluez_owner_changed(self, owner):
+        """Track bluetoothd restarts (runs in the main loop thread)."""
+        previous, self._bluez_owner = self._bluez_owner, owner
+        if previous is None or owner == previous:
+            return # Initial report of the current owner
+        if not owner:
+            logger.warning("BlueZ left the bus; dropping cached devices")
+            with self.lock:
+                self._objects = {}
+                self._players = {}
+            self.connection_changed.set() # Lets the sync loop notice the device is gone
+            self.wakeup.set()
+            return
+        logger.info("BlueZ restarted; re-applying adapter settings and agent")
+        try:
+            self._seed_object_cache(dbus.Interface(self.bus.get_object('org.bluez', '/', introspect=False),
+                                                   'org.freedesktop.DBus.ObjectManager'))
+        except dbus.exceptions.DBusException as e:
+            logger.error("Failed to reseed BlueZ objects after restart: %s", e)
+        # bluetoothd claims its name before the adapter is registered; if hci0 is not there
+        # yet, _on_interfaces_added configures it once it is announced
+        if 'org.bluez.Adapter1' in self._objects.get(BLUETOOTH_ADAPTER_PATH, {}):
+            self._reconfigure_adapter()
+        self._start_agent()
+
+    def _reconfigure_adapter(self):
+        """_configure_adapter for signal handlers: log failures instead of raising."""
+        try:
+            self._configure_adapter()
+        except dbus.exceptions.DBusException as e:
+            logger.error("Failed to configure Bluetooth adapter: %s", e)
+
+    def _start_main_loop(self):
+        """Run the GLib main loop that dispatches D-Bus signals in the background."""
+        if self.main_loop_thread and self.main_loop_thread.is_alive():
+            return
+        self.main_loop = GLib.MainLoop()
+        self.main_loop_thread = Thread(target=self.main_loop.run, daemon=True)
+        self.main_loop_thread.start()
+
+    def _on_interfaces_added(self, path, interfaces):
+        """ObjectManager.InterfacesAdded handler: add the new interfaces to the cache."""
+        interfaces = dbus_to_native(interfaces)
+        path = str(path)
+        with self.lock:
+            self._objects.setdefault(path, {}).update(interfaces)
+            if 'org.bluez.MediaPlayer1' in interfaces:
+                self._players[path.rsplit('/', 1)[0]] = path
+        if 'org.bluez.Adapter1' in interfaces and path == BLUETOOTH_ADAPTER_PATH:
+            # Adapter (re)appeared: after a bluetoothd restart or a hotplug
+            logger.info("Bluetooth adapter %s appeared; applying alias and discoverable", path)
+            self._reconfigure_adapter()
+        if 'org.bluez.Device1' in interfaces:
+            self.connection_changed.set()
+            self.wakeup.set()
+        if 'org.bluez.MediaPlayer1' in interfaces:
+            self.track_changed.set() # Let the sync loop pick up the new player
+            self.wakeup.set()
+
+    def _on_interfaces_removed(self, path, interfaces):
+        """ObjectManager.InterfacesRemoved handler: drop the interfaces from the cache."""
+        path = str(path)
+        with self.lock:
+            entry = self._objects.get(path)
+            if entry is not None:
+                for iface in interfaces:
+                    entry.pop(str(iface), None)
+                if not entry:
+                    del self._objects[path]
+            player_replaced = False
+            if 'org.bluez.MediaPlayer1' in interfaces:
+                device_path = path.rsplit('/', 1)[0]
+                if self._players.get(device_path) == path:
+                    # With AVRCP browsing a phone exposes several players (player0, player1, ...)
+                    remaining = sorted(p for p, ifaces in self._objects.items()
+                                       if p.rsplit('/', 1)[0] == device_path and 'org.bluez.MediaPlayer1' in ifaces)
+                    if remaining:
+                        self._players[device_path] = remaining[0]
+                    else:
+                        del self._players[device_path]
+                    player_replaced = True
+        if player_replaced:
+            self.track_changed.set() # Let the sync loop switch to the remaining player, if any
+            self.wakeup.set()
+        if path == self.connected_device_path:
+            self.connection_changed.set()
+            self.wakeup.set()
+
+    def _on_properties_changed(self, interface, changed, invalidated, path=None):
+        """Properties.PropertiesChanged handler for org.bluez.Device1 objects."""
+        changed = dbus_to_native(changed)
+        with self.lock:
+            props = self._objects.setdefault(str(path), {}).setdefault(str(interface), {})
+            props.update(changed)
+            for name in invalidated:
+                props.pop(name, None)
+        if 'Connected' in changed or 'ServicesResolved' in changed:
+            self.connection_changed.set()
+            self.wakeup.set() # Wake the sync loop instead of waiting for the next poll
+
+    def _on_player_props_changed(self, interface, changed, invalidated):
+        """Properties.PropertiesChanged handler for the current org.bluez.MediaPlayer1."""
+        self._update_track_from_props(dbus_to_native(changed))
+
+    def _update_track_from_props(self, props):
+        """Merge native-typed MediaPlayer1 properties (initial GetAll or a PropertiesChanged delta) into current_track.
+
+        Only ever runs on the GLib main loop thread, which makes it the single
+        producer of current_track. Each update publishes a new dict by plain
+        reference assignment and never mutates a published one, so readers on
+        other threads always see a complete snapshot without taking a lock.
+        """
+        if 'Status' in props:
+            self.playback_status = props['Status']
+            logger.debug("Playback status: %s", self.playback_status)
+
+        previous = self.current_track
+        new_track_info = dict(previous)
+        if 'Track' in props:
+            track = props['Track']
+            # Values are already plain str/int (see dbus_to_native); just default missing ones
+            new_track_info['title'] = track.get('Title', '')
+            new_track_info['artist'] = track.get('Artist', '')
+            new_track_info['album'] = track.get('Album', '')
+            new_track_info['duration'] = track.get('Duration', 0)
+        if 'Position' in props:
+            # Position often missing or unreliable via BlueZ properties
+            new_track_info['position'] = props['Position']
+
+        # Only significant changes (Title/Artist/Album/Duration) need to reach the iPod
+        significant = (new_track_info['title'] != previous['title'] or
+                       new_track_info['artist'] != previous['artist'] or
+                       new_track_info['album'] != previous['album'] or
+                       new_track_info['duration'] != previous['duration'])
+        self.current_track = new_track_info # Publish; latest value wins
+
+        if significant:
+            logger.info("Track updated: %s by %s (%sms)", new_track_info['title'], new_track_info['artist'], new_track_info['duration'])
+            self.track_changed.set()
+            self.wakeup.set()
+
+    def _on_player_snapshot(self, player_path, props):
+        """Reply handler for the initial MediaPlayer1 GetAll (runs in the main loop thread)."""
+        if player_path != self.media_player_path:
+            return # Player was forgotten (e.g. device switch) while the call was in flight
+        self._update_track_from_props(dbus_to_native(props))
+
     def _start_agent(self):
-        """Start Bluetooth agent to handle pairing."""
-        logger.info("Starting Bluetooth agent thread")
-        # Run bluetoothctl agent in a separate process managed by the thread
-        # This avoids blocking the main script with subprocess.run
-        agent_thread = Thread(target=self._agent_process_runner, daemon=True)
-        agent_thread.start()
-
-    def _agent_process_runner(self):
-        """Runs the bluetoothctl agent commands."""
-        logger.info("Bluetooth agent thread running")
+        """Register a Bluetooth agent with BlueZ to handle pairing."""
+        logger.info("Registering Bluetooth agent")
         try:
-            # Using Popen allows interaction if needed, though not used here
-            agent_cmd = ['bluetoothctl', 'agent', 'on', '\n', 'default-agent']
-            # We don't strictly need Popen here, run might be fine
-            # Using shell=True is generally discouraged, but bluetoothctl commands might need it
-            # If not using shell=True, separate commands:
-            subprocess.run(['bluetoothctl', 'agent', 'on'], check=True)
-            subprocess.run(['bluetoothctl', 'default-agent'], check=True)
-            logger.info("Bluetooth agent commands executed")
-            # Keep thread alive if agent needs continuous running (unlikely for default)
-            # time.sleep(3600) # Example placeholder
-        except subprocess.CalledProcessError as e:
-             logger.error(f"Bluetooth agent command failed: {e}")
+            # The agent lives as long as this process, unlike a one-shot bluetoothctl call
+            if not self.agent:
+                self.agent = PairingAgent(self.bus, BLUETOOTH_AGENT_PATH)
+            agent_manager = dbus.Interface(self.bus.get_object('org.bluez', '/org/bluez', introspect=False),
+                                           'org.bluez.AgentManager1')
+            # Without introspection the path must be typed explicitly to marshal as 'o'
+            agent_manager.RegisterAgent(dbus.ObjectPath(BLUETOOTH_AGENT_PATH), BLUETOOTH_AGENT_CAPABILITY)
+            agent_manager.RequestDefaultAgent(dbus.ObjectPath(BLUETOOTH_AGENT_PATH))
+            logger.info("Bluetooth agent registered as default agent")
+        except dbus.exceptions.DBusException as e:
+             logger.error(f"Bluetooth agent registration failed: {e}")
         except Exception as e:
-            logger.exception(f"Error in Bluetooth agent thread: {e}")
+            logger.exception(f"Error registering Bluetooth agent: {e}")
 
     def check_connection_and_update_pulseaudio(self):
         """Checks for connected A2DP device and updates PulseAudio if needed."""
@@ -126,155 +551,208 @@ class BluetoothAudioReceiver:
             logger.warning("D-Bus connection not available, skipping connection check.")
             return None
 
+        self.connection_failed = False
         try:
-            manager = dbus.Interface(self.bus.get_object('org.bluez', '/'), 'org.freedesktop.DBus.ObjectManager')
-            objects = manager.GetManagedObjects()
+            # Snapshot the cached devices; no D-Bus round-trip needed
+            with self.lock:
+                devices = {path: dict(interfaces['org.bluez.Device1'])
+                           for path, interfaces in self._objects.items()
+                           if 'org.bluez.Device1' in interfaces}
             newly_connected_mac = None
 
-            for path, interfaces in objects.items():
-                if 'org.bluez.Device1' in interfaces:
-                    props = interfaces['org.bluez.Device1']
-                    if props.get('Connected') and props.get('ServicesResolved'):
-                        # Check if it's an audio device (A2DP sink for BlueZ)
-                        uuids = props.get('UUIDs', [])
-                        # Common A2DP UUIDs
-                        if '0000110b-0000-1000-8000-00805f9b34fb' in uuids or \
-                           '0000110d-0000-1000-8000-00805f9b34fb' in uuids:
-                            device_mac = str(props.get('Address'))
-                            if device_mac != self.connected_device_mac:
-                                logger.info(f"New A2DP device connected: {device_mac} ({props.get('Alias', 'Unknown Name')})")
-                                newly_connected_mac = device_mac
-                                self.connected_device_path = path
-                                break # Process first connected device found
+            for path, props in devices.items():
+                if props.get('Connected') and props.get('ServicesResolved'):
+                    # Check if it's an audio device (A2DP sink for BlueZ)
+                    uuids = props.get('UUIDs', ())
+                    if not A2DP_UUIDS.isdisjoint(uuids):
+                        device_mac = str(props.get('Address'))
+                        if device_mac != self.connected_device_mac:
+                            logger.info("New A2DP device connected: %s (%s)", device_mac, props.get('Alias', 'Unknown Name'))
+                            newly_connected_mac = device_mac
+                            self.connected_device_path = path
+                            break # Process first connected device found
 
             if newly_connected_mac:
                 old_mac = self.connected_device_mac
                 self.connected_device_mac = newly_connected_mac
                 if self._update_pulseaudio_config(self.connected_device_mac):
-                     logger.info(f"PulseAudio configured for {self.connected_device_mac}")
+                     logger.info("PulseAudio configured for %s", self.connected_device_mac)
                 else:
-                     logger.error(f"Failed to configure PulseAudio for {self.connected_device_mac}")
+                     logger.error("Failed to configure PulseAudio for %s", self.connected_device_mac)
                      self.connected_device_mac = old_mac # Revert on failure
+                     self.connection_failed = True
                      return None # Indicate failure
                 # Reset media player path as it might change with device connection
-                self.media_player_path = None
-                self.media_player_iface = None
-            elif not self.connected_device_mac:
-                 # Check if a previously connected device is still valid
-                 if self.connected_device_path and self.connected_device_path not in objects:
-                     logger.info(f"Previously connected device {self.connected_device_mac} is gone.")
+                self._forget_media_player()
+                self.track_changed.set() # Look up the new device's player on the next sync
+            elif self.connected_device_path:
+                 # Check if the previously connected device is still valid
+                 device_props = devices.get(self.connected_device_path)
+                 if not device_props or not device_props.get('Connected'):
+                     logger.info("Previously connected device %s is gone.", self.connected_device_mac)
                      self.connected_device_mac = None
                      self.connected_device_path = None
-                     self.media_player_path = None
-                     self.media_player_iface = None
+                     self._forget_media_player()
                      self._clear_pulseaudio_loopback() # Optional: clean up loopback
 
 
             return self.connected_device_mac
 
         except dbus.exceptions.DBusException as e:
-            logger.error(f"D-Bus error checking connections: {e}")
+            logger.error("D-Bus error checking connections: %s", e)
             # Handle specific errors, e.g., BlueZ service stopped
             if "org.bluez" in str(e):
                 logger.warning("BlueZ service might not be running.")
             # Reset state if connection lost badly?
             self.connected_device_mac = None
             self.connected_device_path = None
-            self.media_player_path = None
-            self.media_player_iface = None
+            self._forget_media_player()
+            self.connection_failed = True
             return None
         except Exception as e:
-            logger.exception(f"Error checking connected devices: {e}")
+            logger.exception("Error checking connected devices: %s", e)
+            self.connection_failed = True
             return None
 
+    def _get_pulse(self):
+        """Return the PulseAudio connection, reconnecting lazily if it was never made or has dropped."""
+        if self.pulse is not None and self.pulse.connected:
+            return self.pulse
+        self._drop_pulse()
+        try:
+            self.pulse = pulsectl.Pulse('bt-ipod-bridge')
+            logger.info("Connected to PulseAudio")
+        except Exception as e:
+            logger.error("Failed to connect to PulseAudio: %s", e)
+        return self.pulse
+
+    def _drop_pulse(self):
+        """Close a dead PulseAudio connection so the next _get_pulse() opens a fresh one."""
+        if self.pulse is not None:
+            try:
+                self.pulse.close()
+            except Exception:
+                pass
+            self.pulse = None
+
     def _update_pulseaudio_config(self, device_mac):
         """Update PulseAudio configuration with the connected device MAC."""
         logger.info(f"Attempting to update PulseAudio for MAC: {device_mac}")
         if not device_mac:
             return False
+        if not self._get_pulse():
+            logger.error("PulseAudio connection not available, cannot configure loopback.")
+            return False
         try:
-            mac_formatted = device_mac.replace(':', '_')
-            # Possible source names: check both common patterns
-            possible_sources = [
-                f"bluez_source.{mac_formatted}.a2dp_source",
-                 f"bluez_card.{mac_formatted}.a2dp_source" # Some setups might use this
-            ]
-            actual_source = None
-            max_retries = 5
-            retry_delay = 2 # seconds
-
-            for i in range(max_retries):
-                 sources_output = subprocess.check_output(['pactl', 'list', 'sources', 'short'],
-                                                       universal_newlines=True, timeout=5)
-                 found = False
-                 for src in possible_sources:
-                     if src in sources_output:
-                         actual_source = src
-                         found = True
-                         logger.info(f"Found PulseAudio source: {actual_source}")
-                         break
-                 if found:
-                     break
-                 logger.warning(f"Bluetooth source for {device_mac} not found yet. Retrying in {retry_delay}s... ({i+1}/{max_retries})")
-                 time.sleep(retry_delay)
-            else:
-                 logger.error(f"Failed to find Bluetooth source for {device_mac} after multiple retries.")
+            possible_sources = self._source_names.get(device_mac)
+            if possible_sources is None:
+                mac_formatted = device_mac.replace(':', '_')
+                # Possible source names: check both common patterns
+                possible_sources = self._source_names[device_mac] = (
+                    f"bluez_source.{mac_formatted}.a2dp_source",
+                    f"bluez_card.{mac_formatted}.a2dp_source" # Some setups might use this
+                )
+            # The source usually exists already; otherwise wait for PulseAudio to announce it
+            actual_source = self._find_pulseaudio_source(possible_sources)
+            if not actual_source:
+                 logger.warning(f"Bluetooth source for {device_mac} not found yet. Waiting up to {PULSEAUDIO_SOURCE_TIMEOUT}s...")
+                 actual_source = self._wait_for_pulseaudio_source(possible_sources, PULSEAUDIO_SOURCE_TIMEOUT)
+            if not actual_source:
+                 logger.error(f"Failed to find Bluetooth source for {device_mac} after {PULSEAUDIO_SOURCE_TIMEOUT}s.")
                  return False
+            logger.info(f"Found PulseAudio source: {actual_source}")
 
             # Unload any existing loopback module first (robustness)
-            self._clear_pulseaudio_loopback()
+            if not self._clear_pulseaudio_loopback():
+                 return False # Connection lost or module list unavailable; the retry will reconnect
 
             # Load new loopback module with correct source
             logger.info(f"Loading module-loopback: source={actual_source} sink={PULSEAUDIO_SINK}")
-            subprocess.run(['pactl', 'load-module', 'module-loopback',
-                            f'source={actual_source}',
-                            f'sink={PULSEAUDIO_SINK}',
-                            f'latency_msec={PULSEAUDIO_LATENCY_MSEC}'],
-                           check=True, timeout=5) # Use check=True
+            self.pulse.module_load('module-loopback', [f'source={actual_source}',
+                                                       f'sink={PULSEAUDIO_SINK}',
+                                                       f'latency_msec={PULSEAUDIO_LATENCY_MSEC}'])
 
             logger.info(f"Successfully updated PulseAudio loopback for device {device_mac}")
             return True
 
-        except subprocess.TimeoutExpired:
-             logger.error("PulseAudio command timed out.")
-             return False
-        except subprocess.CalledProcessError as e:
-            logger.error(f"PulseAudio command failed: {e} - Stdout: {e.stdout} - Stderr: {e.stderr}")
+        except pulsectl.PulseDisconnected:
+            logger.warning("Lost PulseAudio connection, will reconnect on the next attempt.")
+            self._drop_pulse()
+            return False
+        except pulsectl.PulseError as e:
+            logger.error(f"PulseAudio operation failed: {e}")
             return False
         except Exception as e:
             logger.exception(f"Error updating PulseAudio config: {e}")
             return False
 
+    def _find_pulseaudio_source(self, source_names):
+        """Return the first of source_names currently registered with PulseAudio, or None."""
+        registered = {source.name for source in self.pulse.source_list()}
+        for name in source_names:
+            if name in registered:
+                return name
+        return None
+
+    def _wait_for_pulseaudio_source(self, source_names, timeout):
+        """Block until PulseAudio announces one of source_names, or until timeout seconds pass."""
+        new_indexes = []
+
+        def on_event(ev):
+            if ev.facility == 'source' and ev.t == 'new':
+                new_indexes.append(ev.index)
+                raise pulsectl.PulseLoopStop # Return from event_listen to look the source up
+
+        self.pulse.event_mask_set('source')
+        self.pulse.event_callback_set(on_event)
+        try:
+            deadline = time.monotonic() + timeout
+            # Check again now that we are subscribed, in case it appeared in between
+            found = self._find_pulseaudio_source(source_names)
+            while not found:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                self.pulse.event_listen(timeout=remaining)
+                while new_indexes and not found:
+                    try:
+                        name = self.pulse.source_info(new_indexes.pop(0)).name
+                    except pulsectl.PulseIndexError:
+                        continue # Source went away again before we looked
+                    if name in source_names:
+                        found = name
+            return found
+        finally:
+            self.pulse.event_callback_set(None)
+            self.pulse.event_mask_set('null')
+
     def _clear_pulseaudio_loopback(self):
         """Find and unload any existing module-loopback."""
         logger.info("Clearing existing PulseAudio loopback modules...")
+        if not self._get_pulse():
+            logger.error("PulseAudio connection not available, cannot clear loopback.")
+            return False
         try:
-            modules_output = subprocess.check_output(['pactl', 'list', 'modules', 'short'],
-                                                    universal_newlines=True, timeout=5)
             unloaded_count = 0
-            for line in modules_output.splitlines():
-                if 'module-loopback' in line:
-                    parts = line.split('\t')
-                    if len(parts) > 0 and parts[0].isdigit():
-                        module_id = parts[0]
-                        logger.info(f"Unloading module-loopback ID: {module_id}")
-                        try:
-                             subprocess.run(['pactl', 'unload-module', module_id], check=True, timeout=5)
-                             unloaded_count += 1
-                        except subprocess.CalledProcessError as e_unload:
-                             logger.warning(f"Failed to unload module {module_id}: {e_unload}")
-                        except subprocess.TimeoutExpired:
-                             logger.warning(f"Timeout trying to unload module {module_id}")
+            for module in self.pulse.module_list():
+                if module.name == 'module-loopback':
+                    logger.info(f"Unloading module-loopback ID: {module.index}")
+                    try:
+                         self.pulse.module_unload(module.index)
+                         unloaded_count += 1
+                    except pulsectl.PulseError as e_unload:
+                         logger.warning(f"Failed to unload module {module.index}: {e_unload}")
             if unloaded_count > 0:
                  logger.info(f"Unloaded {unloaded_count} loopback module(s).")
             else:
                  logger.info("No existing loopback modules found to unload.")
             return True
-        except subprocess.TimeoutExpired:
-             logger.error("PulseAudio command timed out while listing modules.")
-             return False
-        except subprocess.CalledProcessError as e:
-            logger.error(f"PulseAudio command failed while listing modules: {e}")
+        except pulsectl.PulseDisconnected:
+            logger.warning("Lost PulseAudio connection, will reconnect on the next attempt.")
+            self._drop_pulse()
+            return False
+        except pulsectl.PulseError as e:
+            logger.error(f"PulseAudio operation failed while listing modules: {e}")
             return False
         except Exception as e:
             logger.exception(f"Error clearing PulseAudio loopback: {e}")
@@ -285,50 +763,98 @@ class BluetoothAudioReceiver:
         if not self.bus or not self.connected_device_path:
             return None
 
-        if self.media_player_path: # Use cached path if available
-             try:
-                  # Check if the cached path still exists
-                  self.bus.get_object('org.bluez', self.media_player_path)
-                  return self.media_player_path
-             except dbus.exceptions.DBusException:
-                  logger.info("Cached media player path is no longer valid.")
-                  self.media_player_path = None
-                  self.media_player_iface = None
+        # Single-flight: if another thread is already resolving the player, wait for its result
+        with self._player_search_lock:
+            if self._player_searching:
+                self._player_search_done.wait(timeout=1.0)
+                return self.media_player_path
+            self._player_searching = True
+        try:
+            return self._resolve_media_player()
+        finally:
+            with self._player_search_lock:
+                self._player_searching = False
+                self._player_search_done.notify_all()
+
+    def _resolve_media_player(self):
+        """Validate the cached player or look it up and subscribe to it; see find_media_player."""
+        device_path = self.connected_device_path
+        if not device_path:
+            return None
+
+        media_player_path = self.media_player_path
+        if media_player_path: # Use cached path if available
+             # Check if the cached path is still the device's player
+             if self._players.get(device_path) == media_player_path:
+                  return media_player_path
+             logger.info("Cached media player path is no longer valid.")
+             self._forget_media_player()
 
         logger.debug("Searching for media player interface...")
         try:
-            manager = dbus.Interface(self.bus.get_object('org.bluez', '/'), 'org.freedesktop.DBus.ObjectManager')
-            objects = manager.GetManagedObjects()
-            # Find the player associated with the connected device
-            player_path = None
-            for path, interfaces in objects.items():
-                 # Ensure the player belongs to our connected device
-                if path.startswith(self.connected_device_path + '/player'):
-                     if 'org.bluez.MediaPlayer1' in interfaces:
-                         player_path = path
-                         logger.info(f"Found media player at: {player_path}")
-                         break # Found it
+            # Find the player associated with the connected device (an index lookup, not a tree walk)
+            player_path = self._players.get(device_path)
 
             if player_path:
-                 self.media_player_path = player_path
-                 # Get the interface proxy once
-                 player_obj = self.bus.get_object('org.bluez', self.media_player_path)
-                 self.media_player_iface = dbus.Interface(player_obj, 'org.bluez.MediaPlayer1')
+                 logger.info("Found media player at: %s", player_path)
+                 # Get the interface proxies once; BlueZ interfaces are known, so skip introspection
+                 player_obj = self.bus.get_object('org.bluez', player_path, introspect=False)
+                 player_iface = dbus.Interface(player_obj, 'org.bluez.MediaPlayer1')
+                 props_iface = dbus.Interface(player_obj, 'org.freedesktop.DBus.Properties')
+                 # Follow changes via signals; subscribe before the snapshot so none are missed
+                 player_signal = self.bus.add_signal_receiver(self._on_player_props_changed,
+                                                              dbus_interface='org.freedesktop.DBus.Properties',
+                                                              signal_name='PropertiesChanged',
+                                                              bus_name='org.bluez',
+                                                              path=player_path,
+                                                              arg0='org.bluez.MediaPlayer1')
+                 with self._player_search_lock:
+                      # The sync thread may have switched devices (and forgotten the player) meanwhile
+                      current = device_path == self.connected_device_path
+                      if current:
+                           previous_signal = self.media_player_signal
+                           self.media_player_path = player_path
+                           self.media_player_iface = player_iface
+                           self.media_player_props_iface = props_iface
+                           self.media_player_signal = player_signal
+                 if not current:
+                      player_signal.remove()
+                      return None
+                 if previous_signal is not None:
+                      previous_signal.remove()
+                 # GetAll only once, as the initial snapshot, and asynchronously: the reply is
+                 # dispatched on the main loop thread in bus order with the player's signals, so
+                 # current_track keeps a single producer and a later delta is never overwritten.
+                 # The update sets track_changed, which brings the sync loop back for it.
+                 props_iface.GetAll('org.bluez.MediaPlayer1',
+                                    reply_handler=lambda props: self._on_player_snapshot(player_path, props),
+                                    error_handler=lambda e: logger.error("Failed to read media player %s: %s", player_path, e))
                  return player_path
             else:
                  logger.debug("No media player interface found for the connected device yet.")
                  return None
 
         except dbus.exceptions.DBusException as e:
-            logger.error(f"D-Bus error finding media player: {e}")
+            logger.error("D-Bus error finding media player: %s", e)
             return None
         except Exception as e:
-            logger.exception(f"Unexpected error finding media player: {e}")
+            logger.exception("Unexpected error finding media player: %s", e)
             return None
 
+    def _forget_media_player(self):
+        """Drop the cached media player proxies and its PropertiesChanged subscription."""
+        # Called from the sync and iPod monitor threads; swap under the lock so only one caller removes the match
+        with self._player_search_lock:
+            player_signal, self.media_player_signal = self.media_player_signal, None
+            self.media_player_path = None
+            self.media_player_iface = None
+            self.media_player_props_iface = None
+        if player_signal is not None:
+            player_signal.remove()
+
 
     def get_track_info(self):
-        """Get current track information using AVRCP via D-Bus."""
+        """Get current track information, kept up to date by MediaPlayer1 PropertiesChanged signals."""
         if not self.bus:
             logger.warning("D-Bus connection not available, cannot get track info.")
             return self.current_track # Return last known
@@ -339,95 +865,43 @@ class BluetoothAudioReceiver:
              # self.current_track = {'title': '', 'artist': '', 'album': '', 'duration': 0, 'position': 0}
              return self.current_track
 
-        try:
-            props_iface = dbus.Interface(self.bus.get_object('org.bluez', self.media_player_path),
-                                        'org.freedesktop.DBus.Properties')
-            props = props_iface.GetAll('org.bluez.MediaPlayer1')
-
-            track_info_changed = False
-            new_track_info = {}
-
-            if 'Track' in props:
-                track = props['Track']
-                new_track_info = {
-                    # Use .get with default values and ensure string conversion
-                    'title': str(track.get('Title', '')),
-                    'artist': str(track.get('Artist', '')),
-                    'album': str(track.get('Album', '')),
-                    # Duration might be dbus.UInt32, cast to int
-                    'duration': int(track.get('Duration', 0)),
-                    # Position often missing or unreliable via BlueZ properties
-                    'position': int(props.get('Position', 0)) # Get position from player props if available
-                }
-
-                # Check if track data actually changed
-                if new_track_info != self.current_track:
-                     # Only log significant changes (Title/Artist/Album/Duration)
-                     if (new_track_info['title'] != self.current_track['title'] or
-                         new_track_info['artist'] != self.current_track['artist'] or
-                         new_track_info['album'] != self.current_track['album'] or
-                         new_track_info['duration'] != self.current_track['duration']):
-                         logger.info(f"Track updated: {new_track_info['title']} by {new_track_info['artist']} ({new_track_info['duration']}ms)")
-                     self.current_track = new_track_info
-                     track_info_changed = True
-                else:
-                    logger.debug("Track info unchanged.")
-
-            # Check for playback status change (useful info)
-            status = str(props.get('Status', 'unknown'))
-            # Could potentially store status if needed elsewhere
-            logger.debug(f"Playback status: {status}")
-
-            # Return changed flag along with track info? Or just update internal state?
-            # For now, just update internal state. The sync thread will decide to send.
-            return self.current_track # Return the potentially updated info
-
-        except dbus.exceptions.DBusException as e:
-            logger.error(f"D-Bus error getting track properties from {self.media_player_path}: {e}")
-            # If the error indicates the player is gone, reset it
-            if "doesn't exist" in str(e) or "disconnected" in str(e):
-                 logger.warning("Media player seems to have disappeared.")
-                 self.media_player_path = None
-                 self.media_player_iface = None
-                 # Reset track info?
-                 self.current_track = {'title': '', 'artist': '', 'album': '', 'duration': 0, 'position': 0}
-            return self.current_track # Return last known or empty
-        except Exception as e:
-            logger.exception(f"Error retrieving track info: {e}")
-            return self.current_track # Return last known
+        # No D-Bus call here: find_media_player took the initial snapshot and the
+        # signal handler replaces current_track whenever the player reports a change.
+        return self.current_track
 
     def _send_media_command(self, command):
          """Send media command (Play, Pause, etc.) via D-Bus MediaPlayer1 interface."""
-         if not self.media_player_iface:
-             logger.warning(f"No media player interface available to send command: {command}")
-             # Fallback to bluetoothctl? Might be less reliable.
-             # Or just report failure. Reporting failure for now.
+         player_iface = self.media_player_iface
+         if player_iface is None and self.find_media_player():
+             # A button pressed before the first track sync; the player may already be known to BlueZ
+             player_iface = self.media_player_iface
+         if player_iface is None:
+             logger.warning("No media player interface available to send command: %s", command)
              return False
 
-         logger.info(f"Sending command '{command}' via D-Bus to {self.media_player_path}")
+         logger.info("Sending command '%s' via D-Bus to %s", command, self.media_player_path)
          try:
               # Call the method directly on the interface proxy
-             method_to_call = getattr(self.media_player_iface, command)
+             method_to_call = getattr(player_iface, command)
              method_to_call()
-             logger.info(f"Command '{command}' sent successfully via D-Bus.")
+             logger.info("Command '%s' sent successfully via D-Bus.", command)
              return True
          except dbus.exceptions.DBusException as e:
-              logger.error(f"D-Bus error sending command '{command}': {e}")
+              logger.error("D-Bus error sending command '%s': %s", command, e)
               # If player gone, clear it
               if "doesn't exist" in str(e) or "disconnected" in str(e):
                  logger.warning("Media player seems to have disappeared.")
-                 self.media_player_path = None
-                 self.media_player_iface = None
+                 self._forget_media_player()
               return False
          except AttributeError:
-              logger.error(f"Media player interface does not support command: {command}")
+              logger.error("Media player interface does not support command: %s", command)
               return False
          except Exception as e:
-              logger.exception(f"Unexpected error sending command '{command}': {e}")
+              logger.exception("Unexpected error sending command '%s': %s", command, e)
               return False
 
     # --- Playback Control Methods ---
-    # Updated to use D-Bus primarily, fallback to bluetoothctl might be removed or kept as backup
+    # All go straight to the cached MediaPlayer1 proxy; no bluetoothctl involved
 
     def play(self):
         """Send play command to connected device."""
@@ -465,6 +939,12 @@ class IPodClient:
     def __init__(self):
         self.process = None
         self.lock = Lock() # Protect self.process
+        self._stdin_fd = None # Raw stdin pipe fd, written with os.writev
+        self._stdout_selector = None # epoll over the stdout pipe (plus a caller's wake fd)
+        self._stdout_buf = '' # Decoded stdout text that does not form a full line yet
+        self._stdout_decoder = None # Incremental UTF-8 decoder; keeps split multi-byte chars between reads
+        self._last_sent = {} # Metadata fields the running client already has
+        self.dropped_metadata = 0 # Updates skipped because the client was not draining stdin
         self.running = False
         logger.info("Initializing iPod client")
 
@@ -482,7 +962,7 @@ class IPodClient:
                     return False
 
                 # Wait for device node to appear (give it some time)
-                if not self._wait_for_device(IPOD_DEVICE_PATH, retries=10, delay=1):
+                if not self._wait_for_device(IPOD_DEVICE_PATH, timeout=IPOD_DEVICE_TIMEOUT):
                     logger.error(f"Device {IPOD_DEVICE_PATH} did not appear after loading modules.")
                     return False
 
@@ -493,9 +973,22 @@ class IPodClient:
                     stdin=subprocess.PIPE,   # <<< ADDED for sending metadata
                     stdout=subprocess.PIPE,  # <<< Needed for reading controls
                     stderr=subprocess.PIPE,  # <<< Good practice to capture errors
-                    universal_newlines=False # Work with bytes for stdin/stdout/stderr
+                    universal_newlines=False, # Work with bytes for stdin/stdout/stderr
                     # bufsize=1 might be useful for line buffering stdout if needed
+                    # Lets subprocess use posix_spawn (vfork-style, no page table copy).
+                    # Safe because Python creates every fd non-inheritable (PEP 446).
+                    close_fds=False
                 )
+                # Metadata goes straight to the pipe fd, bypassing the buffered writer
+                self._stdin_fd = self.process.stdin.fileno()
+                # Non-blocking, so a slow client can never stall the sync thread inside write()
+                os.set_blocking(self._stdin_fd, False)
+                # Controls are read with os.read on the raw fd, so readers can also wait on a wake fd
+                self._stdout_selector = selectors.EpollSelector()
+                self._stdout_selector.register(self.process.stdout.fileno(), selectors.EVENT_READ)
+                self._stdout_buf = ''
+                self._stdout_decoder = codecs.getincrementaldecoder('utf-8')(errors='replace')
+                self._last_sent = {} # A fresh client has no metadata yet
                 self.running = True
                 logger.info(f"iPod client process started (PID: {self.process.pid})")
                 return True
@@ -514,14 +1007,16 @@ class IPodClient:
 
     def _ensure_modules_loaded(self):
         """Load required kernel modules if they aren't already."""
-        modules = ['libcomposite', 'g_ipod_audio', 'g_ipod_hid', 'g_ipod_gadget']
         try:
-            lsmod_output = subprocess.check_output(['lsmod'], universal_newlines=True)
-            for module in modules:
-                 if module not in lsmod_output:
-                      logger.info(f"Loading kernel module: {module}")
-                      # Use check=True for modprobe
-                      subprocess.run(['modprobe', module], check=True, timeout=10)
+            # /proc/modules is what lsmod reads; the first column is the module name
+            with open('/proc/modules') as f:
+                 loaded_modules = {line.split(' ', 1)[0] for line in f}
+            for module in KERNEL_MODULES:
+                 if module not in loaded_modules:
+                      logger.info("Loading kernel module: %s", module)
+                      if not self._finit_module(module):
+                           # Dependencies, compressed modules, install rules etc.: let modprobe sort it out
+                           subprocess.run(['modprobe', module], check=True, timeout=10)
                  else:
                       logger.debug(f"Module {module} already loaded.")
             return True
@@ -532,16 +1027,118 @@ class IPodClient:
              logger.error(f"Failed to load kernel module: {e}")
              return False
         except FileNotFoundError:
-             logger.error("modprobe or lsmod command not found.")
+             logger.error("modprobe command or /proc/modules not found.")
              return False
         except Exception as e:
              logger.exception(f"Error checking/loading kernel modules: {e}")
              return False
 
+    def _finit_module(self, module):
+        """Load a module's .ko straight into the kernel with finit_module(2), skipping the modprobe fork/exec.
+
+        Returns False (without raising) whenever modprobe should handle it instead.
+        """
+        machine = platform.machine() # The kernel's architecture, so only used for the CPU family
+        family = 'arm' if machine.startswith(('arm', 'aarch64')) else 'x86' if machine in ('x86_64', 'i386', 'i686') else None
+        nr = FINIT_MODULE_SYSCALLS.get((family, struct.calcsize('P') * 8))
+        if nr is None:
+            return False
+        path = self._module_file(module)
+        if not path or not path.endswith('.ko'): # Compressed modules need the kernel's decompressor flag
+            return False
+        params = self._module_options(module)
+        if params is None:
+            return False
+        try:
+            fd = os.open(path, os.O_RDONLY | os.O_CLOEXEC)
+        except OSError as e:
+            logger.debug("Cannot open %s for finit_module: %s", path, e)
+            return False
+        try:
+            libc = ctypes.CDLL(None, use_errno=True)
+            libc.syscall.restype = ctypes.c_long
+            if libc.syscall(ctypes.c_long(nr), ctypes.c_int(fd), ctypes.c_char_p(params.encode()), ctypes.c_int(0)) == 0:
+                return True
+            err = ctypes.get_errno()
+            if err == errno.EEXIST: # Raced with something else loading it
+                return True
+            # ENOENT here usually means unresolved symbols, i.e. a dependency that isn't loaded yet
+            logger.debug("finit_module(%s) failed: %s", module, os.strerror(err))
+            return False
+        finally:
+            os.close(fd)
 
-    def _wait_for_device(self, device_path, retries=10, delay=1):
-         """Wait for a device file to exist."""
+    def _module_file(self, module):
+        """Find a module's file under /lib/modules/<release> via modules.dep."""
+        release = os.uname().release
+        base = os.path.join('/lib/modules', release)
+        try:
+            with open(os.path.join(base, 'modules.dep')) as f:
+                for line in f:
+                    path = line.split(':', 1)[0]
+                    name = os.path.basename(path).split('.ko', 1)[0].replace('-', '_')
+                    if name == module:
+                        return path if os.path.isabs(path) else os.path.join(base, path)
+        except OSError as e:
+            logger.debug("Cannot read modules.dep: %s", e)
+        return None
+
+    def _module_options(self, module):
+        """Collect a module's options from modprobe.d and /proc/cmdline, or None if its config needs modprobe itself."""
+        options = []
+        seen = set()
+        for directory in MODPROBE_CONFIG_DIRS:
+            for conf in sorted(glob.glob(os.path.join(directory, '*.conf'))):
+                name = os.path.basename(conf)
+                if name in seen: # Earlier directories override same-named files, as with modprobe
+                    continue
+                seen.add(name)
+                try:
+                    with open(conf) as f:
+                        for line in f:
+                            words = line.split('#', 1)[0].split()
+                            if len(words) < 2 or words[1].replace('-', '_') != module:
+                                continue
+                            if words[0] == 'options':
+                                options.extend(words[2:])
+                            elif words[0] in ('install', 'softdep', 'blacklist'):
+                                return None
+                except OSError:
+                    continue
+        # module.param=value on the kernel command line, which modprobe applies after modprobe.d
+        try:
+            with open('/proc/cmdline') as f:
+                for word in f.read().split():
+                    name, dot, param = word.partition('.')
+                    if dot and '=' in param and name.replace('-', '_') == module:
+                        if '"' in param: # Quoted value that may contain spaces; leave parsing to modprobe
+                            return None
+                        options.append(param)
+        except OSError:
+            pass
+        return ' '.join(options)
+
+
+    def _wait_for_device(self, device_path, timeout=10):
+         """Wait for a device file to exist, woken by inotify as soon as it is created."""
          logger.info(f"Waiting for device {device_path} to appear...")
+         directory, name = os.path.split(device_path)
+         try:
+              watch = InotifyWatch(directory)
+         except OSError as e:
+              logger.warning(f"inotify unavailable ({e}), polling for {device_path} instead.")
+              return self._poll_for_device(device_path, timeout)
+         with watch:
+              # Watch first, then check, so a node created in between is not missed
+              if os.path.exists(device_path) or watch.wait_for(name, timeout):
+                   logger.info(f"Device {device_path} found.")
+                   return True
+         logger.error(f"Device {device_path} not found after {timeout} seconds.")
+         return False
+
+    def _poll_for_device(self, device_path, timeout, delay=1):
+         """Fallback for _wait_for_device: check for the device file once per delay seconds."""
+         retries = max(1, int(timeout / delay))
          for i in range(retries):
              if os.path.exists(device_path):
                   logger.info(f"Device {device_path} found.")
@@ -580,87 +1177,139 @@ class IPodClient:
             else:
                  logger.info("No iPod client process was running.")
             self.process = None
+            self._stdin_fd = None
+            if self._stdout_selector:
+                self._stdout_selector.close()
+                self._stdout_selector = None
 
     def send_metadata(self, track_info):
         """Send track metadata to the iPod client via stdin."""
-        with self.lock:
-            if not self.process or self.process.poll() is not None:
-                logger.warning("Cannot send metadata, iPod client process is not running.")
-                return False
-            if not self.process.stdin:
-                 logger.error("iPod client stdin is not available.")
-                 return False
+        # No lock: start()/stop() only swap these under self.lock, so a local copy is either None or usable
+        process = self.process
+        stdin_fd = self._stdin_fd
+        if process is None or process.poll() is not None:
+            logger.warning("Cannot send metadata, iPod client process is not running.")
+            return False
+        if stdin_fd is None:
+             logger.error("iPod client stdin is not available.")
+             return False
 
         # Format: KEY=Value\n (Assumed - VERIFY THIS)
         # Ensure values are strings and handle potential None values
-        lines_to_send = []
         title = track_info.get('title', '')
         artist = track_info.get('artist', '')
         album = track_info.get('album', '')
         duration = track_info.get('duration', 0) # Duration in ms
 
-        # Only send non-empty fields? Or send empty strings? Sending non-empty.
-        if title: lines_to_send.append(f"TITLE={title}")
-        if artist: lines_to_send.append(f"ARTIST={artist}")
-        if album: lines_to_send.append(f"ALBUM={album}")
-        # Always send duration? Assume 0 if unknown.
-        lines_to_send.append(f"DURATION={duration}")
+        # Only send fields that changed since the last successful write.
+        # Empty values are sent too, so a cleared field is cleared on the client.
+        current = {'title': title, 'artist': artist, 'album': album, 'duration': duration}
+        delta = {k: v for k, v in current.items() if self._last_sent.get(k) != v}
+        if not delta:
+             logger.debug("Metadata unchanged since last send.")
+             return True # Nothing to send is not an error
+
+        iov = [] # Buffers for a single writev(); only the values need encoding
+        if 'title' in delta: iov += (PREFIX_TITLE, title.encode('utf-8'), NEWLINE)
+        if 'artist' in delta: iov += (PREFIX_ARTIST, artist.encode('utf-8'), NEWLINE)
+        if 'album' in delta: iov += (PREFIX_ALBUM, album.encode('utf-8'), NEWLINE)
+        if 'duration' in delta: iov += (PREFIX_DURATION, b'%d' % duration, NEWLINE) # No str round-trip
 
         # Add other fields if the Go client supports them (e.g., Track number, Genre)
 
-        if not lines_to_send:
-             logger.debug("No metadata to send.")
-             return True # Nothing to send is not an error
-
-        data_string = "\n".join(lines_to_send) + "\n"
-        logger.debug(f"Sending metadata to iPod client stdin:\n{data_string.strip()}")
+        if logger.isEnabledFor(logging.DEBUG): # Skip building the preview string in production
+            logger.debug("Sending metadata to iPod client stdin:\n%s", b''.join(iov).decode('utf-8').strip())
 
         try:
-            # Write bytes to stdin
-            self.process.stdin.write(data_string.encode('utf-8'))
-            self.process.stdin.flush() # Ensure data is sent immediately
+            # Drop the update rather than block if the client is not draining its stdin.
+            # _last_sent is left alone, so the next send includes these fields again.
+            _, writable, _ = select.select([], [stdin_fd], [], METADATA_WRITE_TIMEOUT)
+            if not writable:
+                self.dropped_metadata += 1
+                logger.warning("iPod client stdin is full, dropped metadata update (%s dropped so far).", self.dropped_metadata)
+                return False
+            # One syscall for all fields; no join, no buffered write + flush
+            written = os.writev(stdin_fd, iov)
+            total = sum(len(buf) for buf in iov)
+            if written < total:
+                # Only possible for updates larger than PIPE_BUF; finish the lines we started
+                if not self._write_remaining(stdin_fd, b''.join(iov)[written:]):
+                    logger.error("Timed out finishing a partial metadata write to iPod client.")
+                    return False
+            self._last_sent.update(delta)
             return True
+        except BlockingIOError:
+            self.dropped_metadata += 1
+            logger.warning("iPod client stdin is full, dropped metadata update (%s dropped so far).", self.dropped_metadata)
+            return False
         except BrokenPipeError:
             logger.error("Broken pipe: Failed to send metadata to iPod client (process likely died).")
             self.stop() # Stop our reference if pipe is broken
             return False
         except Exception as e:
-            logger.exception(f"Error sending metadata to iPod client: {e}")
+            logger.exception("Error sending metadata to iPod client: %s", e)
             return False
 
-    def read_stdout_line(self):
-        """Read a line from the iPod client's stdout (blocking)."""
-        with self.lock:
-            if not self.process or self.process.poll() is not None:
-                # logger.debug("iPod client not running, cannot read stdout.")
-                return None # Indicate process stopped
-            if not self.process.stdout:
-                logger.error("iPod client stdout is not available.")
-                return None
+    def _write_remaining(self, fd, data, timeout=1.0):
+        """Write the rest of a partially written update to the non-blocking stdin pipe."""
+        view = memoryview(data)
+        while view:
+            _, writable, _ = select.select([], [fd], [], timeout)
+            if not writable:
+                return False
+            try:
+                view = view[os.write(fd, view):]
+            except BlockingIOError:
+                continue
+        return True
+
+    def read_stdout_lines(self, wake_fd=None):
+        """Read every complete line available on the iPod client's stdout (blocking until there is one).
+
+        Returns None once the client is gone, or an empty list early if wake_fd becomes readable.
+        """
+        process = self.process # Lockless snapshot, see send_metadata
+        selector = self._stdout_selector
+        if process is None or process.poll() is not None:
+            # logger.debug("iPod client not running, cannot read stdout.")
+            return None # Indicate process stopped
+        if not process.stdout or selector is None:
+            logger.error("iPod client stdout is not available.")
+            return None
 
         try:
-            # Read bytes and decode
-            line_bytes = self.process.stdout.readline()
-            if not line_bytes: # End of stream (process closed stdout)
-                 logger.info("iPod client stdout reached EOF.")
-                 return None
-            return line_bytes.decode('utf-8').strip()
+            if wake_fd is not None and wake_fd not in selector.get_map():
+                selector.register(wake_fd, selectors.EVENT_READ)
+            stdout_fd = process.stdout.fileno()
+            # Wait until at least one complete line is buffered
+            while '\n' not in self._stdout_buf:
+                ready = [key.fd for key, _ in selector.select()]
+                if wake_fd in ready:
+                    return []
+                # Take everything the pipe holds in one read, so a burst of commands is one wakeup
+                data = os.read(stdout_fd, 65536)
+                if not data: # End of stream (process closed stdout)
+                     logger.info("iPod client stdout reached EOF.")
+                     return None
+                # Decode each chunk once rather than every line separately
+                self._stdout_buf += self._stdout_decoder.decode(data)
+            *lines, self._stdout_buf = self._stdout_buf.split('\n')
+            return [line.strip() for line in lines]
         except Exception as e:
             # Log error but allow loop to potentially continue or exit based on return None
-            logger.exception(f"Error reading iPod client stdout: {e}")
+            logger.exception("Error reading iPod client stdout: %s", e)
             # Check if process is still alive
-            if self.process and self.process.poll() is not None:
+            if process.poll() is not None:
                  logger.warning("iPod client process appears to have exited while reading stdout.")
                  return None # Signal exit
-            # Otherwise, maybe a decoding error - return empty string? Or None?
-            return "" # Return empty string for potential decoding error line
+            return [] # Let the caller carry on with the next read
 
     def read_stderr_line(self):
         """Read a line from the iPod client's stderr (non-blocking check)."""
         # This is less critical, primarily for logging errors from the client
-        with self.lock:
-             if not self.process or self.process.poll() is not None or not self.process.stderr:
-                 return None
+        process = self.process # Lockless snapshot, see send_metadata
+        if process is None or process.poll() is not None or not process.stderr:
+            return None
         # This requires making stderr non-blocking or using select,
         # which adds complexity. A simpler approach is a separate thread
         # or just logging stderr when the process exits.
@@ -678,13 +1327,16 @@ class BTiPodBridge:
         self.stop_event = threading.Event()
         self.sync_thread = None
         self.ipod_monitor_thread = None
-        self.last_sent_track_info = {} # Track what was last sent to iPod client
+        self._stop_evfd = None # eventfd written by stop() to wake the monitor loop out of select
+        self._last_key = (None, None, None, None) # (title, artist, album, duration) last sent to iPod client
         logger.info("Initializing Bluetooth to iPod bridge")
 
     def start(self):
         """Initialize and start all components."""
         logger.info("Starting all components...")
         self.stop_event.clear()
+        if self._stop_evfd is None:
+            self._stop_evfd = os.eventfd(0, os.EFD_NONBLOCK | os.EFD_CLOEXEC)
 
         # Start iPod client first (as it sets up the device node)
         if not self.ipod_client.start():
@@ -708,6 +1360,9 @@ class BTiPodBridge:
         """Stop all components."""
         logger.info("Stopping all components...")
         self.stop_event.set() # Signal threads to stop
+        self.bt_receiver.wakeup.set() # Wake the sync loop
+        if self._stop_evfd is not None:
+            os.eventfd_write(self._stop_evfd, 1) # Wake the monitor loop
 
         # Stop threads first
         if self.sync_thread and self.sync_thread.is_alive():
@@ -717,15 +1372,16 @@ class BTiPodBridge:
                  logger.warning("Sync thread did not finish gracefully.")
         if self.ipod_monitor_thread and self.ipod_monitor_thread.is_alive():
              logger.debug("Waiting for iPod monitor thread to finish...")
-             # Note: readline() in monitor thread might block, stopping might be delayed
-             # Consider closing stdin/stdout of the process in ipod_client.stop()
-             # to help unblock readline()
-             self.ipod_monitor_thread.join(timeout=2) # Shorter timeout as it might block
+             self.ipod_monitor_thread.join(timeout=2)
              if self.ipod_monitor_thread.is_alive():
-                  logger.warning("iPod monitor thread did not finish gracefully (possibly blocked on read).")
+                  logger.warning("iPod monitor thread did not finish gracefully.")
+        if self._stop_evfd is not None:
+            os.close(self._stop_evfd)
+            self._stop_evfd = None
 
         # Stop external processes
         self.ipod_client.stop()
+        self.bt_receiver.stop()
         # Bluetooth service is managed by systemd, usually no need to stop here unless desired
 
         # Clear PulseAudio loopback on exit? Optional.
@@ -753,58 +1409,69 @@ class BTiPodBridge:
     def _sync_loop(self):
         """Background loop to handle connections and metadata synchronization."""
         logger.info("Started sync loop thread")
-        connection_check_interval = 5 # seconds
-        metadata_sync_interval = 2 # seconds (sync more often than connection check)
-        last_connection_check = 0
-        last_metadata_sync = 0
-
-        while not self.stop_event.is_set():
-            now = time.time()
+        retry_interval = 5 # seconds, only used after a failed connection setup or send
+        next_retry = None
+        # Bind what every iteration touches to locals (LOAD_FAST instead of global/attribute lookups)
+        _time = time.time
+        receiver = self.bt_receiver
+        stopping = self.stop_event.is_set
+        wakeup = receiver.wakeup
+        connection_changed = receiver.connection_changed
+        track_changed = receiver.track_changed
+        send_metadata = self.ipod_client.send_metadata
+
+        while not stopping():
+            # Clear before checking the flags so a signal arriving mid-iteration re-wakes us
+            wakeup.clear()
+            now = _time()
             connected_mac = None
 
-            # --- Check Bluetooth Connection Periodically ---
-            if now - last_connection_check > connection_check_interval:
+            # --- Check Bluetooth Connection when BlueZ reports a change (or a retry is due) ---
+            if connection_changed.is_set() or (next_retry is not None and now >= next_retry):
+                 connection_changed.clear()
                  logger.debug("Checking Bluetooth connection...")
-                 connected_mac = self.bt_receiver.check_connection_and_update_pulseaudio()
-                 last_connection_check = now
+                 connected_mac = receiver.check_connection_and_update_pulseaudio()
+                 next_retry = now + retry_interval if receiver.connection_failed else None
             else:
                  # Use cached MAC if not checking connection now
-                 connected_mac = self.bt_receiver.connected_device_mac
+                 connected_mac = receiver.connected_device_mac
 
-            # --- Sync Metadata if Connected ---
-            if connected_mac and (now - last_metadata_sync > metadata_sync_interval):
+            # --- Sync Metadata when the media player reports a change ---
+            if connected_mac and track_changed.is_set():
+                 track_changed.clear()
                  logger.debug("Getting track info...")
-                 current_track = self.bt_receiver.get_track_info()
+                 current_track = receiver.get_track_info()
 
                  # Send metadata to iPod client ONLY if it changed since last send
-                 # Compare relevant fields (title, artist, album, duration)
-                 relevant_current = {k: current_track.get(k) for k in ['title', 'artist', 'album', 'duration']}
-                 relevant_last_sent = {k: self.last_sent_track_info.get(k) for k in ['title', 'artist', 'album', 'duration']}
+                 # Compare relevant fields (title, artist, album, duration) as one tuple
+                 key = (current_track.get('title'), current_track.get('artist'),
+                        current_track.get('album'), current_track.get('duration'))
 
-                 if relevant_current != relevant_last_sent and any(relevant_current.values()): # Send if changed and not empty
+                 if key != self._last_key and any(key): # Send if changed and not empty
                       logger.info("Track info changed, sending update to iPod client.")
-                      if self.ipod_client.send_metadata(current_track):
-                           self.last_sent_track_info = current_track.copy() # Update last sent info on success
+                      if send_metadata(current_track):
+                           self._last_key = key # Update last sent info on success
                       else:
                            logger.error("Failed to send metadata to iPod client.")
-                           # Maybe retry later? Or rely on next successful sync.
-                 elif not any(relevant_current.values()) and any(self.last_sent_track_info.values()):
+                           # Retry after the retry interval
+                           track_changed.set()
+                           next_retry = now + retry_interval
+                 elif not any(key) and any(self._last_key):
                       # If current track is empty but last sent was not, clear it
                       logger.info("Current track is empty, sending empty update to iPod client.")
                       empty_track = {'title': '', 'artist': '', 'album': '', 'duration': 0}
-                      if self.ipod_client.send_metadata(empty_track):
-                           self.last_sent_track_info = empty_track.copy()
-
-                 last_metadata_sync = now
-
-            # --- Sleep to avoid busy-waiting ---
-            # Calculate sleep time based on next event
-            next_connection_check = last_connection_check + connection_check_interval
-            next_metadata_sync = last_metadata_sync + metadata_sync_interval
-            sleep_until = min(next_connection_check, next_metadata_sync)
-            sleep_duration = max(0.1, sleep_until - time.time()) # Sleep at least 0.1s
+                      if send_metadata(empty_track):
+                           self._last_key = ('', '', '', 0)
+                      else:
+                           logger.error("Failed to send empty metadata to iPod client.")
+                           # Retry after the retry interval
+                           track_changed.set()
+                           next_retry = now + retry_interval
 
-            self.stop_event.wait(timeout=sleep_duration) # Use event wait for responsiveness
+            # --- Sleep until something happens ---
+            # BlueZ signals and stop() set wakeup; only time out when a retry is pending
+            sleep_duration = None if next_retry is None else max(0.1, next_retry - _time()) # Sleep at least 0.1s
+            wakeup.wait(timeout=sleep_duration)
 
         logger.info("Sync loop thread finished.")
 
@@ -812,38 +1479,38 @@ class BTiPodBridge:
     def _ipod_monitor_loop(self):
         """Background loop to read iPod client stdout and trigger BT controls."""
         logger.info("Started iPod client monitor loop thread")
-
-        while not self.stop_event.is_set() and self.ipod_client.running:
-             line = self.ipod_client.read_stdout_line()
-
-             if line is None: # Process likely terminated or EOF
+        # Same local binding as in _sync_loop
+        ipod_client = self.ipod_client
+        receiver = self.bt_receiver
+        stopping = self.stop_event.is_set
+        read_lines = ipod_client.read_stdout_lines
+        stop_evfd = self._stop_evfd
+        commands = IPOD_COMMANDS
+        debug = logger.debug
+
+        while not stopping() and ipod_client.running:
+             lines = read_lines(stop_evfd)
+
+             if lines is None: # Process likely terminated or EOF
                   logger.info("iPod client stdout monitoring stopped (process ended or EOF).")
                   # Attempt to restart client? Or just exit thread? Exiting for now.
                   # Maybe signal main thread to handle restart logic if desired.
                   break # Exit loop
 
-             if not line: # Empty line, skip
-                  continue
-
-             logger.info(f"Received from iPod client stdout: '{line}'")
-
-             # --- Parse command and trigger Bluetooth action ---
-             # (Commands are ASSUMED - VERIFY from Go client source)
-             command = line.upper() # Make case-insensitive
-
-             if command == "PLAY":
-                  self.bt_receiver.play()
-             elif command == "PAUSE":
-                  self.bt_receiver.pause()
-             elif command == "NEXT":
-                  self.bt_receiver.next_track()
-             elif command == "PREVIOUS" or command == "PREV":
-                  self.bt_receiver.previous_track()
-             elif command == "STOP":
-                  self.bt_receiver.stop_playback()
-             # Add more commands if needed (e.g., volume up/down if supported)
-             else:
-                  logger.warning(f"Unknown command received from iPod client: '{line}'")
+             # Empty when woken by stop(); otherwise everything that arrived since the last read
+             for line in lines:
+                  if not line: # Empty line, skip
+                       continue
+
+                  debug("Received from iPod client stdout: '%s'", line)
+
+                  # --- Parse command and trigger Bluetooth action ---
+                  # Make case-insensitive; the client normally sends upper case already
+                  action = commands.get(line if line.isupper() else line.upper())
+                  if action:
+                       getattr(receiver, action)()
+                  else:
+                       logger.warning("Unknown command received from iPod client: '%s'", line)
 
         logger.info("iPod client monitor loop thread finished.")
 
@@ -38,7 +38,7 @@ fi
 # --- Dependency Installation ---
 echo "[1/9] Installing required system packages..."
 apt update
-# Added: git, build tools, kernel headers, Go, Python D-Bus/GI, PulseAudio+BT, USB utils
+# Added: git, build tools, kernel headers, Go, Python D-Bus/GI/pulsectl, PulseAudio+BT, USB utils
 # Ensure raspberrypi-kernel-headers matches your kernel version (usually handled by apt)
 apt install -y --no-install-recommends \
     git \
@@ -46,7 +46,7 @@ apt install -y --no-install-recommends \
     golang \
     bluez bluez-tools \
     pulseaudio pulseaudio-module-bluetooth \
-    python3 python3-dbus python3-gi \
+    python3 python3-dbus python3-gi python3-pulsectl \
     libusb-dev \
     alsa-utils \
     usbutils # Useful for debugging USB gadget
@@ -299,6 +299,8 @@ User=root
 Group=root
 # Add environment variables if needed by the script
 # Environment="VAR=value"
+# Uncomment to also send the bridge log to the journal (it always goes to /var/log/bt-ipod-bridge.log)
+# Environment="BT_IPOD_BRIDGE_CONSOLE_LOG=1"
 
 [Install]
 WantedBy=multi-user.target